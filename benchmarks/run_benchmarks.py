@@ -0,0 +1,386 @@
+"""
+Benchmarks dos caminhos críticos da engine e da GUI.
+
+Roda em Linux sem monitor: o pyautogui e o keyboard são substituídos por stubs
+(nenhum evento real de mouse/teclado é enviado) e os `time.sleep` da engine são
+anulados, de modo que `execute_sequence` mede apenas o custo da própria engine.
+Os benchmarks da GUI precisam de um display; se DISPLAY não estiver definido e o
+Xvfb estiver instalado, um servidor virtual é iniciado automaticamente.
+
+Uso:
+    python benchmarks/run_benchmarks.py --output benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json
+
+Cada amostra repete o benchmark até durar pelo menos MIN_SAMPLE_TIME (como o
+`timeit.Timer.autorange`) e o resultado é a mediana das amostras. O baseline guarda
+em "thresholds" um limite por benchmark, maior para os que variaram mais entre amostras.
+
+Com --compare, o processo termina com código 1 se algum benchmark ficar mais
+lento que o baseline além do limite (--threshold, ou "thresholds" do próprio baseline)
+ou se algum benchmark do baseline não tiver rodado (ex: GUI sem display), a menos
+que --allow-missing seja usado.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import logging
+import os
+import platform
+import select
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+DEFAULT_THRESHOLD = 0.15  # 15% mais lento que o baseline = regressão
+SPREAD_FACTOR = 3  # Limite por benchmark: pelo menos 3x a variação observada no baseline
+MIN_SAMPLE_TIME = 0.2  # Duração mínima de cada amostra (s)
+XVFB_TIMEOUT = 10  # Espera máxima pelo Xvfb informar o display (s)
+
+
+def _install_input_stubs():
+    """Substitui pyautogui e keyboard por stubs que não enviam eventos reais."""
+    def noop(*args, **kwargs):
+        return None
+
+    pyautogui_stub = types.ModuleType("pyautogui")
+    for name in ("moveTo", "click", "rightClick", "middleClick", "hotkey", "press", "write"):
+        setattr(pyautogui_stub, name, noop)
+    pyautogui_stub.position = lambda: (0, 0)
+    sys.modules["pyautogui"] = pyautogui_stub
+
+    keyboard_stub = types.ModuleType("keyboard")
+    keyboard_stub.add_hotkey = noop
+    sys.modules["keyboard"] = keyboard_stub
+
+
+_install_input_stubs()
+
+# Configura o logging antes de importar a GUI para que o basicConfig dela não
+# escreva milhares de linhas em logs/app.log durante os benchmarks.
+logging.basicConfig(level=logging.WARNING, handlers=[logging.NullHandler()])
+
+from src import automation  # noqa: E402
+from src.automation import AutomationEngine  # noqa: E402
+
+# Anula os sleeps só na visão que a engine tem do módulo time; o resto do processo não é afetado
+automation.time = types.SimpleNamespace(**{
+    **{name: getattr(time, name) for name in dir(time) if not name.startswith("_")},
+    "sleep": lambda seconds: None,
+})
+
+
+def _make_engine(n_steps: int) -> AutomationEngine:
+    engine = AutomationEngine()
+    for i in range(n_steps):
+        if i % 4 == 3:
+            engine.steps.append(automation.ClickStep(i % 1920, i % 1080, 0.0, 'left', 'type', "abc", use_data_file=(i % 8 == 7), clear_field=True))
+        else:
+            engine.steps.append(automation.ClickStep(i % 1920, i % 1080, 0.0, ('left', 'right', 'middle')[i % 3]))
+    engine.data_lines = [str(i) for i in range(100)]
+    return engine
+
+
+def _sample(func, number: int) -> float:
+    """Tempo total (s) de `number` chamadas de func."""
+    gc.collect()
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - start
+
+
+def _autorange(func) -> int:
+    """Quantas chamadas de func por amostra para durar pelo menos MIN_SAMPLE_TIME (1, 2, 5, 10, 20...)."""
+    i = 1
+    while True:
+        for number in (i, 2 * i, 5 * i):
+            if _sample(func, number) >= MIN_SAMPLE_TIME:
+                return number
+        i *= 10
+
+
+def _measure(func, repeat: int, ops: int) -> dict:
+    """
+    Mede func: `repeat` amostras de `number` chamadas cada; vale a mediana do tempo por chamada.
+    spread é o intervalo interquartil relativo à mediana (não é afetado por uma amostra isolada lenta).
+    """
+    number = _autorange(func)  # Também serve de aquecimento
+    times = [_sample(func, number) / number for _ in range(repeat)]
+    seconds = statistics.median(times)
+    quartiles = statistics.quantiles(times, n=4)
+    return {
+        "seconds": seconds,
+        "ops": ops,
+        "ops_per_sec": ops / seconds,
+        "number": number,
+        "spread": (quartiles[2] - quartiles[0]) / seconds,
+    }
+
+
+def bench_execute_sequence(tmpdir, repeat):
+    engine = _make_engine(2_000)
+    return _measure(lambda: engine.execute_sequence(loops=5), repeat, 2_000 * 5)
+
+
+def _bench_save(n_steps):
+    def bench(tmpdir, repeat):
+        engine = _make_engine(n_steps)
+        path = os.path.join(tmpdir, f"save_{n_steps}.json")
+        return _measure(lambda: engine.save_to_file(path), repeat, n_steps)
+    return bench
+
+
+def _bench_load(n_steps):
+    def bench(tmpdir, repeat):
+        path = os.path.join(tmpdir, f"load_{n_steps}.json")
+        _make_engine(n_steps).save_to_file(path)
+        engine = AutomationEngine()
+        return _measure(lambda: engine.load_from_file(path), repeat, n_steps)
+    return bench
+
+
+def bench_load_data_file(tmpdir, repeat):
+    n_lines = 1_000_000
+    path = os.path.join(tmpdir, "data_1m.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(str(8000 + i % 1000) for i in range(n_lines)))
+        f.write("\n")
+    engine = AutomationEngine()
+    return _measure(lambda: engine.load_data_file(path), repeat, n_lines)
+
+
+def bench_validate_data(tmpdir, repeat):
+    n_lines = 1_000_000
+    engine = AutomationEngine()
+    engine.data_lines = ["00190500954014481606906809350314337370000000100"] * n_lines
+    return _measure(engine.validate_data, repeat, n_lines)
+
+
+def _gui_app(n_steps):
+    from src.gui import AutoClickerApp
+    app = AutoClickerApp()
+    app.withdraw()
+    app.engine = _make_engine(n_steps)
+    return app
+
+
+def bench_gui_refresh_list(tmpdir, repeat):
+    n_steps = 5_000
+    app = _gui_app(n_steps)
+    try:
+        def run():
+            app._refresh_list()
+            app.update_idletasks()
+        return _measure(run, repeat, n_steps)
+    finally:
+        app.destroy()
+
+
+def bench_gui_highlight_step(tmpdir, repeat):
+    n_steps = 5_000
+    n_calls = 50
+    app = _gui_app(n_steps)
+    try:
+        app._refresh_list()
+        app.update_idletasks()
+
+        def run():
+            for i in range(n_calls):
+                app.highlight_step(i * (n_steps // n_calls))
+            app.update_idletasks()
+        return _measure(run, repeat, n_calls)
+    finally:
+        app.destroy()
+
+
+ENGINE_BENCHMARKS = {
+    "execute_sequence_zero_delay": bench_execute_sequence,
+    "save_to_file_1k": _bench_save(1_000),
+    "save_to_file_100k": _bench_save(100_000),
+    "load_from_file_1k": _bench_load(1_000),
+    "load_from_file_100k": _bench_load(100_000),
+    "load_data_file_1m": bench_load_data_file,
+    "validate_data_1m": bench_validate_data,
+}
+
+GUI_BENCHMARKS = {
+    "gui_refresh_list_5k": bench_gui_refresh_list,
+    "gui_highlight_step_5k": bench_gui_highlight_step,
+}
+
+
+@contextlib.contextmanager
+def _display():
+    """Garante um display X para os benchmarks da GUI. Retorna o motivo se não houver."""
+    if os.environ.get("DISPLAY") or sys.platform != "linux":
+        yield None
+        return
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        yield "sem DISPLAY e Xvfb não encontrado"
+        return
+    # Com -displayfd o Xvfb escolhe um display livre e escreve o número no pipe quando está pronto
+    read_fd, write_fd = os.pipe()
+    proc = subprocess.Popen([xvfb, "-displayfd", str(write_fd), "-screen", "0", "1920x1080x24"],
+                            pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    display = b""
+    with os.fdopen(read_fd, "rb") as pipe:
+        deadline = time.monotonic() + XVFB_TIMEOUT
+        while not display.endswith(b"\n"):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([pipe], [], [], remaining)[0]:
+                break
+            chunk = os.read(read_fd, 16)
+            if not chunk:  # Xvfb fechou o pipe sem informar o display
+                break
+            display += chunk
+    display = display.strip().decode()
+    if not display.isdigit() or proc.poll() is not None:
+        proc.terminate()
+        proc.wait()
+        yield f"Xvfb não iniciou (código {proc.returncode})"
+        return
+    os.environ["DISPLAY"] = f":{display}"
+    try:
+        yield None
+    finally:
+        proc.terminate()
+        proc.wait()
+        del os.environ["DISPLAY"]
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def run(selected, repeat):
+    results = {}
+    skipped = {}
+    benchmarks = {**ENGINE_BENCHMARKS, **GUI_BENCHMARKS}
+    names = [n for n in benchmarks if not selected or any(s in n for s in selected)]
+
+    with tempfile.TemporaryDirectory() as tmpdir, _display() as no_display:
+        for name in names:
+            if name in GUI_BENCHMARKS:
+                reason = no_display
+                if reason is None:
+                    try:
+                        import customtkinter  # noqa: F401
+                    except ImportError:
+                        reason = "customtkinter não instalado"
+                if reason:
+                    skipped[name] = reason
+                    print(f"{name:<30} PULADO ({reason})", file=sys.stderr)
+                    continue
+            # Engine e GUI imprimem cada passo; não queremos medir o terminal
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                try:
+                    result = benchmarks[name](tmpdir, repeat)
+                except Exception as e:
+                    if name not in GUI_BENCHMARKS:
+                        raise
+                    # Ex: TclError se o display cair ou não aceitar conexões
+                    result = None
+                    reason = f"{type(e).__name__}: {e}"
+            if result is None:
+                skipped[name] = reason
+                print(f"{name:<30} PULADO ({reason})", file=sys.stderr)
+                continue
+            results[name] = result
+            print(f"{name:<30} {result['seconds'] * 1000:10.2f} ms  {result['ops_per_sec']:14,.0f} ops/s"
+                  f"  (IQR {result['spread']:.1%}, {result['number']}x por amostra)", file=sys.stderr)
+
+    thresholds = {"default": DEFAULT_THRESHOLD}
+    for name, result in results.items():
+        thresholds[name] = round(max(DEFAULT_THRESHOLD, SPREAD_FACTOR * result["spread"]), 3)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+            "min_sample_time": MIN_SAMPLE_TIME,
+        },
+        "thresholds": thresholds,
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(current, baseline, threshold=None, allow_missing=False):
+    """
+    Compara resultados com um baseline. Retorna a lista de regressões.
+    Um threshold explícito vale para todos; senão usa o limite de cada benchmark no baseline.
+    Benchmarks do baseline que não rodaram agora (pulados ou com erro) também contam como
+    regressão, a menos que allow_missing seja True (aí só geram aviso).
+    """
+    thresholds = {} if threshold is not None else baseline.get("thresholds", {})
+    default = threshold if threshold is not None else thresholds.get("default", DEFAULT_THRESHOLD)
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        limit = thresholds.get(name, default)
+        change = result["seconds"] / base["seconds"] - 1
+        status = "REGRESSÃO" if change > limit else "ok"
+        print(f"{name:<30} {change:+8.1%} (limite {limit:+.0%}) {status}", file=sys.stderr)
+        if change > limit:
+            regressions.append(name)
+
+    for name in baseline.get("results", {}):
+        if name in current["results"]:
+            continue
+        reason = current.get("skipped", {}).get(name, "não executado")
+        status = "aviso" if allow_missing else "AUSENTE"
+        print(f"{name:<30} {'sem resultado':>8} ({reason}) {status}", file=sys.stderr)
+        if not allow_missing:
+            regressions.append(name)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do AutoClicker.")
+    parser.add_argument("--output", help="Salva os resultados neste arquivo JSON (ex: baseline).")
+    parser.add_argument("--compare", help="Compara com um baseline JSON salvo anteriormente.")
+    parser.add_argument("--threshold", type=float, help="Fração de lentidão tolerada para todos os benchmarks "
+                                                          f"(padrão: limites do baseline, mínimo {DEFAULT_THRESHOLD}).")
+    parser.add_argument("--repeat", type=int, default=7, help="Amostras por benchmark; vale a mediana.")
+    parser.add_argument("--allow-missing", action="store_true",
+                        help="Com --compare, só avisa (sem falhar) sobre benchmarks do baseline que não rodaram.")
+    parser.add_argument("--only", nargs="*", default=[], help="Roda apenas benchmarks cujo nome contenha estes trechos.")
+    args = parser.parse_args(argv)
+
+    current = run(args.only, args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(current, f, indent=4)
+        print(f"Resultados salvos em {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        # Com --only, os benchmarks não selecionados não contam como ausentes
+        if args.only:
+            baseline["results"] = {n: r for n, r in baseline.get("results", {}).items() if any(s in n for s in args.only)}
+        if compare(current, baseline, args.threshold, args.allow_missing):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,7 +4,20 @@ import dataclasses
 import json
 import logging
 import os
-from typing import List, Literal, Optional
+import threading
+from typing import Callable, List, Literal, Optional, Tuple
+
+from .validation import ValidationReport, validate_lines, write_quarantine
+
+# Tempos fixos de cada passo (s), além do delay configurado
+SETTLE_DELAY = 0.1      # Após mover o mouse, para garantir que "assentou"
+CLICK_DURATION = 0.1    # duration passado ao clique (simula humano)
+CLEAR_KEY_DELAY = 0.1   # Antes/entre/depois de Ctrl+A e Del ao limpar o campo
+TYPE_PRE_DELAY = 0.2    # Antes de começar a digitar
+TYPE_INTERVAL = 0.1     # Entre cada caractere digitado
+
+# Bytes finais já lidos do arquivo de dados que são comparados antes de uma leitura incremental
+APPEND_CHECK_WINDOW = 4096
 
 @dataclasses.dataclass
 class ClickStep:
@@ -17,13 +30,27 @@ class ClickStep:
     text_content: str = ""
     use_data_file: bool = False # Se True, usa linha do arquivo carregado
     clear_field: bool = False # Se True, envia Ctrl+A + Del antes de digitar
+    skip_settle: bool = False # Se True, não espera o mouse assentar após mover (definido pelo otimizador)
 
     def __str__(self):
+        stay = " [SEM ESPERA]" if self.skip_settle else ""
         if self.action_type == 'type':
             src = " (ARQUIVO)" if self.use_data_file else f" '{self.text_content}'"
             clear = " [LIMPAR]" if self.clear_field else ""
-            return f"DIGITAR em ({self.x}, {self.y}):{src}{clear} - Delay: {self.delay}s"
-        return f"CLIQUE {self.button.upper()} em ({self.x}, {self.y}) - Delay: {self.delay}s"
+            return f"DIGITAR em ({self.x}, {self.y}):{src}{clear}{stay} - Delay: {self.delay}s"
+        return f"CLIQUE {self.button.upper()} em ({self.x}, {self.y}){stay} - Delay: {self.delay}s"
+
+@dataclasses.dataclass
+class _DataFileState:
+    """Estado de um arquivo de dados lido do disco, usado pela recarga incremental."""
+    lines: List[str]
+    line_numbers: List[int]  # Linha no arquivo (1-based) de cada item de lines
+    offset: int  # Bytes já lidos (até a última quebra de linha)
+    newlines: int  # Quebras de linha antes de `offset`
+    partial: bool  # Última linha lida não terminava em '\n'
+    size: int  # Tamanho do arquivo na leitura
+    mtime_ns: int
+    tail: bytes  # Últimos bytes (até APPEND_CHECK_WINDOW) antes de `offset`
 
 class AutomationEngine:
     """Gerencia a sequência de passos e a execução."""
@@ -32,21 +59,102 @@ class AutomationEngine:
         self.is_running = False
         self.logger = logging.getLogger(__name__)
         self.data_lines: List[str] = []
+        self.data_line_numbers: List[int] = []  # Linha no arquivo de cada item de data_lines
+        # Comprimentos aceitos na validação dos dados (None = o predominante no arquivo)
+        self.valid_lengths: Optional[List[int]] = None
+
+        # Recarga automática (hot reload) dos arquivos de sequência e dados.
+        # Os contadores de geração mudam a cada carga/salvamento manual: uma leitura em
+        # segundo plano iniciada antes disso é descartada em vez de sobrescrever o arquivo novo.
+        self.sequence_path: Optional[str] = None
+        self.data_path: Optional[str] = None
+        self._sequence_stat: Optional[Tuple[int, int]] = None  # (mtime_ns, tamanho) da versão em uso
+        self._sequence_failed_stat: Optional[Tuple[int, int]] = None  # Última versão que falhou ao ler
+        self._saved_steps: List[ClickStep] = []  # Passos como estão no arquivo (para detectar edições)
+        self._sequence_generation = 0
+        self._data_generation = 0
+        self._data_state: Optional[_DataFileState] = None  # Linhas do arquivo antes da validação
+        self._pending_steps: Optional[List[ClickStep]] = None
+        self._pending_data: Optional[_DataFileState] = None
+        self._reload_lock = threading.Lock()
+        self._watch_stop: Optional[threading.Event] = None
+        self._on_change_callback: Optional[Callable[[], None]] = None
 
     def load_data_file(self, filepath: str) -> int:
         """Carrega linhas de dados de um arquivo txt. Retorna qtd linhas."""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                self.data_lines = [line.strip() for line in f.readlines() if line.strip()]
+            with open(filepath, 'rb') as f:
+                stat = os.fstat(f.fileno())
+                raw = f.read()
+            state = self._data_state_from_bytes(raw, stat)
+            with self._reload_lock:
+                self._data_generation += 1
+                self.data_path = filepath
+                self._data_state = state
+                self.data_lines = state.lines
+                self.data_line_numbers = state.line_numbers
+                self._pending_data = None
             self.logger.info(f"Dados carregados: {len(self.data_lines)} linhas.")
             return len(self.data_lines)
         except Exception as e:
             self.logger.error(f"Erro ao carregar arquivo de dados: {e}")
             raise e
 
-    def add_step(self, x: int, y: int, delay: float, button: str = 'left', action_type: str = 'click', text_content: str = "", use_data_file: bool = False, clear_field: bool = False):
+    @staticmethod
+    def _parse_data_bytes(raw: bytes, start: int = 0, first_line: int = 1):
+        """
+        Converte o conteúdo bruto do arquivo de dados em linhas.
+        Retorna (linhas, números das linhas no arquivo, offset, parcial): offset aponta para
+        o byte seguinte à última quebra de linha e parcial indica se a última linha
+        retornada ainda não terminou. first_line é o número da primeira linha de raw.
+        """
+        # Só '\n' separa linhas ('\r' de arquivos do Windows sai no strip), como no
+        # controle de offset abaixo
+        stripped = [line.strip() for line in raw.decode('utf-8').split('\n')]
+        if all(stripped[:-1]):
+            # Caso comum: nenhuma linha em branco no meio do arquivo
+            lines = stripped if stripped[-1] else stripped[:-1]
+            numbers = list(range(first_line, first_line + len(lines)))
+        else:
+            numbers = [n for n, line in enumerate(stripped, first_line) if line]
+            lines = [line for line in stripped if line]
+        last_nl = raw.rfind(b'\n')
+        offset = start + last_nl + 1
+        partial = bool(raw[last_nl + 1:].strip())
+        return lines, numbers, offset, partial
+
+    @classmethod
+    def _data_state_from_bytes(cls, raw: bytes, stat: os.stat_result) -> _DataFileState:
+        lines, numbers, offset, partial = cls._parse_data_bytes(raw)
+        return _DataFileState(lines, numbers, offset, raw.count(b'\n', 0, offset), partial, len(raw),
+                              stat.st_mtime_ns, raw[max(0, offset - APPEND_CHECK_WINDOW):offset])
+
+    def validate_data(self, quarantine_path: Optional[str] = None) -> ValidationReport:
+        """
+        Pré-validação das linhas de dados (tamanho, só dígitos e DVs FEBRABAN).
+        Os comprimentos aceitos vêm de valid_lengths (None = o predominante no arquivo).
+        Linhas inválidas saem de data_lines e são gravadas em um arquivo de quarentena
+        (por padrão <arquivo>_invalidos.txt, ao lado do arquivo de dados).
+        """
+        # data_lines atribuído diretamente (sem arquivo) não tem números de linha próprios
+        numbers = self.data_line_numbers if len(self.data_line_numbers) == len(self.data_lines) else None
+        report = validate_lines(self.data_lines, self.valid_lengths, numbers)
+        self.data_lines = report.valid_lines
+        self.data_line_numbers = report.valid_line_numbers
+        if report.invalid:
+            if quarantine_path is None and self.data_path:
+                base, ext = os.path.splitext(self.data_path)
+                quarantine_path = f"{base}_invalidos{ext or '.txt'}"
+            if quarantine_path:
+                write_quarantine(report, quarantine_path)
+            self.logger.warning(f"Validação dos dados: {report}. Quarentena: {quarantine_path}")
+        else:
+            self.logger.info(f"Validação dos dados: {report}.")
+        return report
+
+    def add_step(self, x: int, y: int, delay: float, button: str = 'left', action_type: str = 'click', text_content: str = "", use_data_file: bool = False, clear_field: bool = False, skip_settle: bool = False):
         """Adiciona um novo passo à sequência."""
-        step = ClickStep(x, y, delay, button, action_type, text_content, use_data_file, clear_field) # type: ignore
+        step = ClickStep(x, y, delay, button, action_type, text_content, use_data_file, clear_field, skip_settle) # type: ignore
         self.steps.append(step)
         self.logger.info(f"Passo adicionado: {step}")
         print(f"Passo adicionado: {step}")
@@ -60,21 +168,41 @@ class AutomationEngine:
     def get_steps(self) -> List[ClickStep]:
         return self.steps
 
+    def set_steps(self, steps: List[ClickStep]):
+        """Substitui a sequência inteira (ex: após otimização)."""
+        self.steps[:] = steps
+        self.logger.info(f"Sequência substituída: {len(self.steps)} passos.")
+        print(f"Sequência substituída: {len(self.steps)} passos.")
+
     def remove_step(self, index: int):
         """Remove o passo no índice especificado."""
         if 0 <= index < len(self.steps):
             removed = self.steps.pop(index)
+            self.clear_stale_skip_settle()
             self.logger.info(f"Passo removido: {removed}")
             print(f"Passo removido: {removed}")
         else:
             self.logger.warning(f"Tentativa de remover índice inválido: {index}")
             print(f"Índice inválido para remoção: {index}")
 
-    def execute_sequence(self, loops: int = 1, infinite: bool = False, on_step_callback=None, confirm_between_loops: bool = False, confirm_callback=None):
+    def clear_stale_skip_settle(self):
+        """
+        Desmarca skip_settle de passos que não estão no ponto do passo anterior
+        (após editar a lista, carregar ou recarregar um JSON editado à mão).
+        """
+        for i, step in enumerate(self.steps):
+            if step.skip_settle and (i == 0 or (self.steps[i - 1].x, self.steps[i - 1].y) != (step.x, step.y)):
+                step.skip_settle = False
+                self.logger.info(f"Passo {i+1} volta a esperar o mouse assentar (ponto anterior é outro).")
+
+    def execute_sequence(self, loops: int = 1, infinite: bool = False, on_step_callback=None, confirm_between_loops: bool = False, confirm_callback=None, on_reload_callback=None, validate_data: bool = False):
         """
         Executa a lista de passos.
         :param confirm_between_loops: Se True, pede confirmação antes do próximo loop.
         :param confirm_callback: Função que retorna Bool (True=Continua, False=Para).
+        :param on_reload_callback: Chamada quando arquivos recarregados são aplicados entre loops.
+            Recebe a mensagem de erro se a recarga encerrou a execução (ou None).
+        :param validate_data: Se True, dados recarregados passam por validate_data() antes do uso.
         """
         if not self.steps:
             self.logger.warning("Tentativa de executar lista vazia.")
@@ -102,6 +230,23 @@ class AutomationEngine:
                         self.logger.info("Usuário cancelou no diálogo de confirmação.")
                         break
 
+                # Aplica arquivos alterados em disco somente na virada do loop
+                if self.apply_pending_reload():
+                    error = None
+                    if validate_data:
+                        report = self.validate_data()
+                        # Sem linhas válidas, os passos com arquivo digitariam "SEM DADOS"
+                        if not self.data_lines and any(s.action_type == 'type' and s.use_data_file for s in self.steps):
+                            error = f"Nenhuma linha de dados válida após recarregar ({report}). Execução encerrada."
+                    if not self.steps:
+                        error = "Sequência recarregada está vazia. Execução encerrada."
+                    if error:
+                        self.logger.error(error)
+                    if on_reload_callback:
+                        on_reload_callback(error)
+                    if error:
+                        break
+
                 current_loop += 1
                 print(f"--- Loop {current_loop} ---")
                 self.logger.info(f"Iniciando Loop {current_loop}")
@@ -137,31 +282,33 @@ class AutomationEngine:
                         # Garante movimento antes do clique
                         pyautogui.moveTo(step.x, step.y)
                         
-                        # Pequeno delay para garantir que o mouse "assentou"
-                        time.sleep(0.1)
+                        # Pequeno delay para garantir que o mouse "assentou" (dispensado em passos
+                        # que o otimizador marcou por estarem no mesmo ponto do passo anterior)
+                        if not step.skip_settle:
+                            time.sleep(SETTLE_DELAY)
                         
                         # Usa duration para segurar o clique por alguns milissegundos (simula humano)
                         if btn == 'right':
-                            pyautogui.rightClick(duration=0.1)
+                            pyautogui.rightClick(duration=CLICK_DURATION)
                         elif btn == 'middle':
-                            pyautogui.middleClick(duration=0.1)
+                            pyautogui.middleClick(duration=CLICK_DURATION)
                         else:
-                            pyautogui.click(duration=0.1)
+                            pyautogui.click(duration=CLICK_DURATION)
                         
                         # Se for ação de digitar, escreve o texto
                         if step.action_type == 'type':
                             # Limpar campo antes de digitar?
                             if step.clear_field:
                                 self.logger.info("Limpando campo (Ctrl+A + Del)...")
-                                time.sleep(0.1)
+                                time.sleep(CLEAR_KEY_DELAY)
                                 pyautogui.hotkey('ctrl', 'a')
-                                time.sleep(0.1)
+                                time.sleep(CLEAR_KEY_DELAY)
                                 pyautogui.press('del')
-                                time.sleep(0.1)
+                                time.sleep(CLEAR_KEY_DELAY)
 
                             if text_to_type:
-                                time.sleep(0.2) # Aumentado delay antes de digitar
-                                pyautogui.write(text_to_type, interval=0.1) # Digitação mais lenta
+                                time.sleep(TYPE_PRE_DELAY) # Aumentado delay antes de digitar
+                                pyautogui.write(text_to_type, interval=TYPE_INTERVAL) # Digitação mais lenta
                             
                     except Exception as e:
                         self.logger.error(f"Erro ao executar ação PyAutoGUI no passo {i+1}: {e}")
@@ -195,39 +342,226 @@ class AutomationEngine:
         try:
             with open(filepath, 'w') as f:
                 json.dump(data, f, indent=4)
+            # O próprio salvamento não deve disparar a recarga automática
+            with self._reload_lock:
+                self._sequence_generation += 1
+                self.sequence_path = filepath
+                self._sequence_stat = self._file_stat(filepath)
+                self._sequence_failed_stat = None
+                self._saved_steps = [dataclasses.replace(step) for step in self.steps]
+                self._pending_steps = None
             self.logger.info(f"Sequência salva em {filepath}")
             print(f"Sequência salva em {filepath}")
         except Exception as e:
             self.logger.error(f"Erro ao salvar arquivo: {e}")
             raise e
 
+    def _read_sequence_file(self, filepath: str) -> List[ClickStep]:
+        """Lê e valida um arquivo JSON de sequência, sem alterar a sequência atual."""
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+
+        steps = []
+        for item in data:
+            # Garante que os tipos estão corretos ao carregar
+            # Compatibilidade com versões antigas (sem action_type)
+            action = item.get('action_type', 'click')
+            text = item.get('text_content', '')
+            use_file = item.get('use_data_file', False) # Default False para retrocompatibilidade
+            clear = item.get('clear_field', False)
+            skip_settle = item.get('skip_settle', False)
+
+            steps.append(ClickStep(
+                x=int(item['x']),
+                y=int(item['y']),
+                delay=float(item['delay']),
+                button=str(item['button']), # type: ignore
+                action_type=str(action), # type: ignore
+                text_content=str(text),
+                use_data_file=bool(use_file),
+                clear_field=bool(clear),
+                skip_settle=bool(skip_settle)
+            ))
+        return steps
+
     def load_from_file(self, filepath: str):
         """Carrega uma sequência de um arquivo JSON."""
         try:
-            with open(filepath, 'r') as f:
-                data = json.load(f)
-            
-            self.steps.clear()
-            for item in data:
-                # Garante que os tipos estão corretos ao carregar
-                # Compatibilidade com versões antigas (sem action_type)
-                action = item.get('action_type', 'click')
-                text = item.get('text_content', '')
-                use_file = item.get('use_data_file', False) # Default False para retrocompatibilidade
-                clear = item.get('clear_field', False)
-                
-                self.add_step(
-                    x=int(item['x']),
-                    y=int(item['y']),
-                    delay=float(item['delay']),
-                    button=str(item['button']),
-                    action_type=str(action),
-                    text_content=str(text),
-                    use_data_file=bool(use_file),
-                    clear_field=bool(clear)
-                )
+            stat = self._file_stat(filepath)
+            steps = self._read_sequence_file(filepath)
+
+            with self._reload_lock:
+                self.steps.clear()
+                for step in steps:
+                    self.add_step(**dataclasses.asdict(step))
+                self.clear_stale_skip_settle()
+                self._sequence_generation += 1
+                self.sequence_path = filepath
+                self._sequence_stat = stat
+                self._sequence_failed_stat = None
+                self._saved_steps = [dataclasses.replace(step) for step in self.steps]
+                self._pending_steps = None
             self.logger.info(f"Sequência carregada de {filepath}")
             print(f"Sequência carregada de {filepath}")
         except Exception as e:
             self.logger.error(f"Erro ao carregar arquivo: {e}")
             raise e
+
+    @staticmethod
+    def _file_stat(filepath: str) -> Tuple[int, int]:
+        stat = os.stat(filepath)
+        return stat.st_mtime_ns, stat.st_size
+
+    def has_unsaved_changes(self) -> bool:
+        """True se a sequência foi editada desde a última carga/salvamento/recarga."""
+        return self.steps != self._saved_steps
+
+    def has_pending_steps(self) -> bool:
+        """True se há uma sequência lida do disco aguardando apply_pending_reload()."""
+        with self._reload_lock:
+            return self._pending_steps is not None
+
+    def discard_pending_steps(self):
+        """Descarta a sequência recarregada (mantém a da memória até o arquivo mudar de novo)."""
+        with self._reload_lock:
+            self._pending_steps = None
+        self.logger.info("Recarga da sequência descartada; mantendo os passos da memória.")
+
+    def start_watching(self, interval: float = 1.0, on_change_callback: Optional[Callable[[], None]] = None):
+        """
+        Inicia a vigilância dos arquivos de sequência e dados (via mtime e tamanho).
+        Alterações são lidas em segundo plano e aplicadas na próxima virada de loop.
+        :param on_change_callback: Chamada (na thread de vigilância) quando uma alteração
+            fica aguardando apply_pending_reload(), ex: para a interface atualizar a lista.
+        """
+        if self._watch_stop is not None:
+            return
+        self._on_change_callback = on_change_callback
+        self._watch_stop = threading.Event()
+        threading.Thread(target=self._watch_files, args=(self._watch_stop, interval), daemon=True).start()
+        self.logger.info(f"Recarga automática ativada (intervalo: {interval}s).")
+
+    def stop_watching(self):
+        """Encerra a vigilância dos arquivos."""
+        if self._watch_stop is not None:
+            self._watch_stop.set()
+            self._watch_stop = None
+            self.logger.info("Recarga automática desativada.")
+
+    def _watch_files(self, stop_event: threading.Event, interval: float):
+        while not stop_event.wait(interval):
+            changed = False
+            try:
+                changed |= self._check_sequence_file()
+            except Exception as e:
+                self.logger.error(f"Erro ao recarregar sequência: {e}")
+            try:
+                changed |= self._check_data_file()
+            except Exception as e:
+                self.logger.error(f"Erro ao recarregar dados: {e}")
+            if changed and self._on_change_callback:
+                self._on_change_callback()
+
+    def _check_sequence_file(self) -> bool:
+        """Lê a sequência se o arquivo mudou. Retorna True se ela ficou aguardando aplicação."""
+        with self._reload_lock:
+            path, generation = self.sequence_path, self._sequence_generation
+            known, failed = self._sequence_stat, self._sequence_failed_stat
+        if not path or not os.path.exists(path):
+            return False
+        stat = self._file_stat(path)
+        if stat == known or stat == failed:
+            return False
+
+        # Arquivo inválido (ex: salvo pela metade) mantém a versão atual. O erro é
+        # registrado uma vez por versão do arquivo, não a cada verificação.
+        try:
+            steps = self._read_sequence_file(path)
+        except Exception as e:
+            with self._reload_lock:
+                if generation == self._sequence_generation:
+                    self._sequence_failed_stat = stat
+            self.logger.error(f"Erro ao recarregar sequência (mantendo a versão atual): {e}")
+            return False
+        with self._reload_lock:
+            if generation != self._sequence_generation:
+                return False  # Outra sequência foi carregada/salva durante a leitura
+            self._pending_steps = steps
+            self._sequence_stat = stat
+            self._sequence_failed_stat = None
+        self.logger.info(f"Sequência alterada em disco: {len(steps)} passos aguardando o próximo loop.")
+        return True
+
+    def _check_data_file(self) -> bool:
+        """Lê o arquivo de dados se ele mudou. Retorna True se as linhas ficaram aguardando aplicação."""
+        with self._reload_lock:
+            path, generation = self.data_path, self._data_generation
+            base = self._pending_data or self._data_state
+        if not path or base is None or not os.path.exists(path):
+            return False
+
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if (stat.st_mtime_ns, stat.st_size) == (base.mtime_ns, base.size):
+                return False
+
+            # Se o arquivo cresceu e os últimos bytes já lidos continuam iguais, trata como
+            # acréscimo e lê só o que veio depois do offset. Compromisso: para não reler o
+            # arquivo inteiro a cada acréscimo, só essa janela final é conferida; uma edição
+            # anterior a ela feita junto com um acréscimo só é vista quando o arquivo for
+            # reescrito sem crescer (ou recarregado manualmente). Qualquer outra mudança
+            # relê o arquivo todo.
+            appended = None
+            if stat.st_size > base.size and base.offset > 0:
+                f.seek(base.offset - len(base.tail))
+                if f.read(len(base.tail)) == base.tail:
+                    appended = f.read()
+            if appended is None:
+                f.seek(0)
+                raw = f.read()
+
+        if appended is not None:
+            new_lines, new_numbers, offset, partial = self._parse_data_bytes(appended, base.offset, base.newlines + 1)
+            lines, numbers = list(base.lines), list(base.line_numbers)
+            if base.partial and lines:
+                # A última linha estava incompleta e foi relida junto com o acréscimo
+                lines.pop()
+                numbers.pop()
+            lines.extend(new_lines)
+            numbers.extend(new_numbers)
+            read = appended[:offset - base.offset]
+            tail = (base.tail + read)[-APPEND_CHECK_WINDOW:]
+            state = _DataFileState(lines, numbers, offset, base.newlines + read.count(b'\n'), partial,
+                                   base.offset + len(appended), stat.st_mtime_ns, tail)
+            self.logger.info(f"Dados acrescentados em disco: {len(lines)} linhas no total.")
+        else:
+            state = self._data_state_from_bytes(raw, stat)
+            self.logger.info(f"Arquivo de dados alterado em disco: {len(state.lines)} linhas.")
+
+        with self._reload_lock:
+            if generation != self._data_generation:
+                return False  # Outro arquivo de dados foi carregado durante a leitura
+            self._pending_data = state
+        return True
+
+    def apply_pending_reload(self) -> bool:
+        """Aplica alterações lidas pela vigilância. Retorna True se algo mudou."""
+        with self._reload_lock:
+            changed = False
+            if self._pending_steps is not None:
+                self.steps[:] = self._pending_steps
+                self.clear_stale_skip_settle()
+                self._saved_steps = [dataclasses.replace(step) for step in self.steps]
+                self._pending_steps = None
+                self.logger.info(f"Sequência recarregada: {len(self.steps)} passos.")
+                changed = True
+            if self._pending_data is not None:
+                self._data_state = self._pending_data
+                self.data_lines = self._data_state.lines
+                self.data_line_numbers = self._data_state.line_numbers
+                self._pending_data = None
+                self.logger.info(f"Dados recarregados: {len(self.data_lines)} linhas.")
+                changed = True
+        if changed:
+            print("Arquivos recarregados.")
+        return changed
@@ -9,6 +9,7 @@ import os
 import tkinter.messagebox as messagebox
 from tkinter import filedialog
 from .automation import AutomationEngine, ClickStep
+from .optimizer import optimize_steps
 
 # Configuração de Logging
 if not os.path.exists("logs"):
@@ -198,6 +199,16 @@ class AutoClickerApp(ctk.CTk):
         self.lbl_data_info = ctk.CTkLabel(self.file_box, text="Dados: 0 linhas", text_color="gray")
         self.lbl_data_info.pack(side="left", padx=5)
 
+        self.chk_hot_reload = ctk.CTkCheckBox(self.file_box, text="Auto-Recarregar", command=self.toggle_hot_reload)
+        self.chk_hot_reload.pack(side="right", padx=5)
+
+        self.chk_validate = ctk.CTkCheckBox(self.file_box, text="Validar Boletos")
+        self.chk_validate.pack(side="right", padx=5)
+
+        # Comprimentos aceitos na validação; vazio = o predominante no arquivo
+        self.entry_lengths = ctk.CTkEntry(self.file_box, placeholder_text="Tamanhos (ex: 47,48)", width=130)
+        self.entry_lengths.pack(side="right", padx=5)
+
         # File Operations
         self.op_box = ctk.CTkFrame(self.config_frame, fg_color="transparent")
         self.op_box.pack(pady=5, padx=5, fill="x")
@@ -211,6 +222,9 @@ class AutoClickerApp(ctk.CTk):
         self.btn_clear = ctk.CTkButton(self.op_box, text="Limpar Lista", command=self.clear_list, fg_color="gray", width=80)
         self.btn_clear.pack(side="left", padx=5, expand=True, fill="x")
 
+        self.btn_optimize = ctk.CTkButton(self.op_box, text="Otimizar", command=self.optimize_sequence, fg_color="teal", width=80)
+        self.btn_optimize.pack(side="left", padx=5, expand=True, fill="x")
+
         self.chk_markers = ctk.CTkCheckBox(self.op_box, text="Marcadores", command=self.toggle_markers)
         self.chk_markers.pack(side="right", padx=5)
 
@@ -270,6 +284,42 @@ class AutoClickerApp(ctk.CTk):
             except Exception as e:
                 self.lbl_status.configure(text=f"Erro ao carregar dados: {e}", text_color="red")
 
+    def toggle_hot_reload(self):
+        """Liga/desliga a vigilância dos arquivos JSON e .txt carregados."""
+        if self.chk_hot_reload.get():
+            self.engine.start_watching(on_change_callback=lambda: self.after(0, self._on_pending_reload))
+            self.lbl_status.configure(text="Recarga automática ativada.", text_color="white")
+        else:
+            self.engine.stop_watching()
+            self.lbl_status.configure(text="Recarga automática desativada.", text_color="white")
+
+    def _on_pending_reload(self):
+        """
+        Arquivo alterado em disco com a execução parada: aplica já e atualiza a lista.
+        Se a lista tem edições não salvas, pergunta antes de descartá-las.
+        """
+        if self.engine.is_running:
+            return  # A engine aplica na próxima virada de loop
+        if self.engine.has_pending_steps() and self.engine.has_unsaved_changes():
+            discard = messagebox.askyesno(
+                "Recarga Automática",
+                "O arquivo da sequência foi alterado no disco, mas a lista tem alterações não salvas.\n"
+                "Descartar as alterações da lista e recarregar o arquivo?"
+            )
+            if not discard:
+                self.engine.discard_pending_steps()
+                self.lbl_status.configure(text="Recarga ignorada: mantendo a lista atual.", text_color="yellow")
+        if self.engine.apply_pending_reload():
+            self._on_files_reloaded()
+
+    def _on_files_reloaded(self, error=None):
+        self._refresh_list()
+        self.lbl_data_info.configure(text=f"Dados: {len(self.engine.data_lines)} linhas")
+        if error:
+            messagebox.showerror("Recarga Automática", error)
+        else:
+            self.lbl_status.configure(text="Arquivos recarregados do disco.", text_color="white")
+
     def toggle_infinite_loop(self):
         if self.chk_infinite.get():
             self.entry_loops.configure(state="disabled")
@@ -388,6 +438,7 @@ class AutoClickerApp(ctk.CTk):
             step = self.engine.steps[index]
             step.x = new_x
             step.y = new_y
+            self.engine.clear_stale_skip_settle()
             print(f"Passo {index+1} atualizado para ({new_x}, {new_y})")
             # Recarrega a lista para mostrar novos valores
             self._refresh_list()
@@ -425,14 +476,43 @@ class AutoClickerApp(ctk.CTk):
             self.lbl_status.configure(text="Número de loops inválido!", text_color="red")
             return
             
+        # Resolve uma recarga detectada pouco antes de iniciar (sem descartar edições sem perguntar)
+        self._on_pending_reload()
+
         infinite = self.chk_infinite.get()
         confirm_loops = bool(self.chk_confirm.get())
-            
+        validate = bool(self.chk_validate.get())
+
+        if validate:
+            try:
+                lengths = [int(part) for part in self.entry_lengths.get().replace(";", ",").split(",") if part.strip()]
+            except ValueError:
+                self.lbl_status.configure(text="Tamanhos inválidos! Use números separados por vírgula.", text_color="red")
+                return
+            self.engine.valid_lengths = lengths or None
+
+        # Pré-validação: linhas inválidas vão para quarentena antes de gastar um loop com elas
+        if validate and self.engine.data_lines:
+            report = self.engine.validate_data()
+            self.lbl_data_info.configure(text=f"Dados: {len(self.engine.data_lines)} linhas")
+            if report.invalid:
+                shown = [f"Linha {line_no}: {reason}" for line_no, _, reason in report.invalid[:10]]
+                if len(report.invalid) > len(shown):
+                    shown.append(f"... e mais {len(report.invalid) - len(shown)}")
+                messagebox.showwarning(
+                    "Validação dos Dados",
+                    f"{len(report.invalid)} linha(s) inválida(s) removida(s).\n" + "\n".join(shown) +
+                    f"\n\nQuarentena: {report.quarantine_path}"
+                )
+            if not self.engine.data_lines:
+                self.lbl_status.configure(text="Nenhuma linha de dados válida!", text_color="red")
+                return
+
         self.lbl_status.configure(text="Executando...", text_color="white")
         self.btn_execute.configure(state="disabled")
-        threading.Thread(target=self._run_engine, args=(loops, infinite, confirm_loops), daemon=True).start()
+        threading.Thread(target=self._run_engine, args=(loops, infinite, confirm_loops, validate), daemon=True).start()
 
-    def _run_engine(self, loops, infinite, confirm_loops):
+    def _run_engine(self, loops, infinite, confirm_loops, validate=False):
         def confirmation_callback(loop_num):
             # Esta função roda na thread da engine.
             # MessageBox no Python Tkinter no Windows geralmente bloqueia a thread chamadora
@@ -444,7 +524,9 @@ class AutoClickerApp(ctk.CTk):
             infinite=infinite, 
             on_step_callback=lambda i: self.after(0, self.highlight_step, i),
             confirm_between_loops=confirm_loops,
-            confirm_callback=confirmation_callback
+            confirm_callback=confirmation_callback,
+            on_reload_callback=lambda error: self.after(0, self._on_files_reloaded, error),
+            validate_data=validate
         )
         # Restaura estado ao finalizar
         self.after(0, self._on_execution_finished)
@@ -478,6 +560,30 @@ class AutoClickerApp(ctk.CTk):
             except Exception as e:
                 self.lbl_status.configure(text=f"Erro ao carregar: {e}", text_color="red")
 
+    def optimize_sequence(self):
+        """Mostra o que a otimização mudaria e aplica somente se o usuário confirmar."""
+        if self.engine.is_running:
+            self.lbl_status.configure(text="Pare a execução antes de otimizar.", text_color="yellow")
+            return
+
+        result = optimize_steps(self.engine.steps)
+        if not result.changes:
+            self.lbl_status.configure(text="Nada a otimizar.", text_color="white")
+            return
+
+        # Limita o tamanho do diálogo em sequências grandes
+        shown = result.changes[:15]
+        if len(result.changes) > len(shown):
+            shown.append(f"... e mais {len(result.changes) - len(shown)} alteração(ões)")
+        summary = "\n".join(shown)
+        message = (f"{summary}\n\nPassos: {len(self.engine.steps)} -> {len(result.steps)}\n"
+                   f"Tempo estimado por loop: {result.time_before:.2f}s -> {result.time_after:.2f}s "
+                   f"(-{result.time_saved:.2f}s)\n\nAplicar?")
+        if messagebox.askyesno("Otimizar Sequência", message):
+            self.engine.set_steps(result.steps)
+            self._refresh_list()
+            self.lbl_status.configure(text=f"Sequência otimizada (-{result.time_saved:.2f}s por loop).", text_color="white")
+
     def clear_list(self):
         self.engine.clear_steps()
         self._refresh_list()
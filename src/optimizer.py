@@ -0,0 +1,108 @@
+import dataclasses
+from typing import List
+
+from .automation import (
+    CLEAR_KEY_DELAY,
+    CLICK_DURATION,
+    SETTLE_DELAY,
+    TYPE_INTERVAL,
+    TYPE_PRE_DELAY,
+    ClickStep,
+)
+
+# Delays abaixo disto ficam cobertos pela espera de assentamento do próximo passo
+TINY_DELAY = 0.05
+
+
+@dataclasses.dataclass
+class OptimizationResult:
+    """Sequência otimizada e o que mudou em relação à original."""
+    steps: List[ClickStep]
+    changes: List[str]
+    time_before: float  # Duração estimada de um loop (s)
+    time_after: float
+
+    @property
+    def time_saved(self) -> float:
+        return self.time_before - self.time_after
+
+    def __str__(self):
+        return (f"{len(self.changes)} alteração(ões), estimativa por loop: "
+                f"{self.time_before:.2f}s -> {self.time_after:.2f}s (-{self.time_saved:.2f}s)")
+
+
+def estimate_step_time(step: ClickStep) -> float:
+    """Estimativa do tempo gasto por execute_sequence em um passo."""
+    total = CLICK_DURATION + step.delay
+    if not step.skip_settle:
+        total += SETTLE_DELAY
+    if step.action_type == 'type':
+        if step.clear_field:
+            total += 3 * CLEAR_KEY_DELAY
+        # Texto vindo do arquivo tem tamanho desconhecido: conta só a espera antes de digitar
+        if step.use_data_file:
+            total += TYPE_PRE_DELAY
+        elif step.text_content:
+            total += TYPE_PRE_DELAY + TYPE_INTERVAL * len(step.text_content)
+    return total
+
+
+def estimate_duration(steps: List[ClickStep]) -> float:
+    """Duração estimada de um loop da sequência."""
+    return sum(estimate_step_time(step) for step in steps)
+
+
+def _can_merge_typing(first: ClickStep, second: ClickStep, tiny_delay: float) -> bool:
+    """Dois passos de digitação seguidos no mesmo campo viram um só digitando os dois textos."""
+    return (
+        first.action_type == 'type' and second.action_type == 'type'
+        and (first.x, first.y) == (second.x, second.y)
+        and not first.use_data_file and not second.use_data_file
+        and not second.clear_field  # Limpar apagaria o texto do primeiro passo
+        and first.delay <= tiny_delay  # Uma espera real entre os dois não é descartada
+    )
+
+
+def optimize_steps(steps: List[ClickStep], tiny_delay: float = TINY_DELAY) -> OptimizationResult:
+    """
+    Remove trabalho redundante da sequência sem mudar o texto digitado nem a ordem dos cliques:
+    - Passos de digitação seguidos no mesmo campo são mesclados (o clique repetido
+      no campo e as esperas fixas do segundo passo deixam de existir).
+    - Passos no mesmo ponto do passo anterior são marcados com skip_settle: o engine
+      ainda chama moveTo (sem efeito com o cursor já no ponto), mas não espera assentar
+      (o primeiro passo nunca é marcado, pois o cursor pode estar em qualquer lugar no
+      início da execução).
+    - Delays menores que tiny_delay são zerados quando o próximo passo fica em outro
+      ponto (a espera de assentamento após o movimento já separa as ações).
+    A sequência original não é alterada.
+    """
+    changes: List[str] = []
+    merged: List[ClickStep] = []
+    numbers: List[str] = []  # Número original de cada passo resultante, para o relatório
+
+    for i, step in enumerate(steps):
+        if merged and _can_merge_typing(merged[-1], step, tiny_delay):
+            first = merged[-1]
+            merged[-1] = dataclasses.replace(first, text_content=first.text_content + step.text_content, delay=step.delay)
+            numbers[-1] = f"{numbers[-1]}+{i + 1}"
+            continue
+        merged.append(dataclasses.replace(step))
+        numbers.append(str(i + 1))
+
+    for i, (number, step) in enumerate(zip(numbers, merged)):
+        if "+" in number:
+            changes.append(f"Passos {number}: digitação no mesmo campo ({step.x}, {step.y}) mesclada em '{step.text_content}'")
+        if i > 0 and not step.skip_settle and (merged[i - 1].x, merged[i - 1].y) == (step.x, step.y):
+            changes.append(f"Passo {number}: mesmo ponto do passo anterior, sem esperar o mouse assentar")
+            step.skip_settle = True
+        following = merged[(i + 1) % len(merged)]
+        if 0 < step.delay < tiny_delay and (following.x, following.y) != (step.x, step.y):
+            changes.append(f"Passo {number}: delay {step.delay}s -> 0s")
+            step.delay = 0.0
+
+    return OptimizationResult(
+        steps=merged,
+        changes=changes,
+        time_before=estimate_duration(steps),
+        time_after=estimate_duration(merged),
+    )
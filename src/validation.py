@@ -0,0 +1,322 @@
+import dataclasses
+import functools
+import itertools
+import logging
+from typing import Collection, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Sem numpy a validação continua funcionando, só que linha a linha
+    np = None
+
+logger = logging.getLogger(__name__)
+
+# Comprimentos com dígitos verificadores FEBRABAN
+BARCODE_LENGTH = 44         # Código de barras (bancário ou arrecadação)
+LINHA_BANCARIA_LENGTH = 47  # Linha digitável de boleto bancário
+LINHA_ARRECADACAO_LENGTH = 48  # Linha digitável de arrecadação (concessionárias/tributos)
+FEBRABAN_LENGTHS = (BARCODE_LENGTH, LINHA_BANCARIA_LENGTH, LINHA_ARRECADACAO_LENGTH)
+
+_DIGITS = b"0123456789"
+_CHUNK_ROWS = 4096
+
+
+@dataclasses.dataclass
+class ValidationReport:
+    """Resultado da validação de um arquivo de dados."""
+    total: int
+    valid_lines: List[str]
+    valid_line_numbers: List[int]  # Linha no arquivo (1-based) de cada linha válida
+    invalid: List[Tuple[int, str, str]]  # (linha no arquivo, conteúdo, motivo)
+    quarantine_path: Optional[str] = None
+
+    def __str__(self):
+        return f"{len(self.valid_lines)}/{self.total} linhas válidas, {len(self.invalid)} inválidas"
+
+
+def validate_lines(lines: List[str], lengths: Optional[Collection[int]] = None,
+                   line_numbers: Optional[List[int]] = None) -> ValidationReport:
+    """
+    Valida as linhas de dados antes da execução.
+    Todas precisam ser numéricas e ter um dos comprimentos em `lengths`. Sem `lengths`,
+    vale o comprimento predominante no arquivo (44, 47 e 48 dígitos são sempre aceitos,
+    pois os DVs já conferem a linha inteira). Linhas com 44, 47 ou 48 dígitos têm os
+    DVs FEBRABAN (mód. 10/11) conferidos.
+    As linhas são agrupadas por comprimento e cada grupo é validado de uma vez.
+    :param line_numbers: Linha no arquivo de cada item (padrão: 1, 2, 3...), usada no relatório.
+    """
+    if line_numbers is None:
+        line_numbers = list(range(1, len(lines) + 1))
+    if np is not None:
+        reasons = _find_invalid_numpy(lines, lengths)
+        keep = np.ones(len(lines), dtype=bool)
+        keep[list(reasons)] = False
+        keep = keep.tolist()
+        valid = list(itertools.compress(lines, keep))
+        valid_numbers = list(itertools.compress(line_numbers, keep))
+    else:
+        reasons = _find_invalid_python(lines, lengths)
+        valid = [line for i, line in enumerate(lines) if i not in reasons]
+        valid_numbers = [n for i, n in enumerate(line_numbers) if i not in reasons]
+
+    invalid = [(line_numbers[i], lines[i], reasons[i]) for i in sorted(reasons)]
+    return ValidationReport(total=len(lines), valid_lines=valid, valid_line_numbers=valid_numbers, invalid=invalid)
+
+
+def _length_problem(length: int, lengths: Optional[Collection[int]], dominant: int) -> Optional[str]:
+    """Motivo para rejeitar uma linha pelo comprimento, ou None se ele é aceito."""
+    if lengths is not None:
+        if length in lengths:
+            return None
+        return f"comprimento {length} fora dos permitidos ({', '.join(map(str, sorted(lengths)))})"
+    if length == dominant or length in FEBRABAN_LENGTHS:
+        return None
+    return f"comprimento {length} diferente do predominante no arquivo ({dominant})"
+
+
+def write_quarantine(report: ValidationReport, filepath: str):
+    """Grava as linhas inválidas (conteúdo original) em um arquivo à parte."""
+    with open(filepath, 'w', encoding='utf-8') as f:
+        for _, content, _ in report.invalid:
+            f.write(content + "\n")
+    report.quarantine_path = filepath
+    for line_no, content, reason in report.invalid:
+        logger.warning(f"Linha {line_no} em quarentena ({reason}): '{content}'")
+
+
+# --- Versão vetorizada (numpy) ---
+#
+# Todos os DVs de um grupo saem de dois produtos de matrizes: cada coluna de pesos
+# tem zero fora das posições que entram no cálculo daquele DV. A matriz de dígitos
+# é float32 para usar BLAS; as somas (no máximo 48 * 18) são exatas.
+
+# 1.0 para os bytes '5'..'9', 0.0 para os demais
+_HIGH_DIGIT = np.isin(np.arange(256), np.frombuffer(b"56789", dtype=np.uint8)).astype(np.float32) if np is not None else None
+
+
+def _weight_matrices(length: int, position_sets: List[List[int]]):
+    """Pesos mód. 10 (2,1,2,1...), marcação dos dígitos dobrados e pesos mód. 11 (2..9)."""
+    w10 = np.zeros((length, len(position_sets)), dtype=np.float32)
+    doubled = np.zeros_like(w10)
+    w11 = np.zeros_like(w10)
+    for col, positions in enumerate(position_sets):
+        # positions vem da direita para a esquerda
+        for i, pos in enumerate(positions):
+            w10[pos, col] = 2 if i % 2 == 0 else 1
+            doubled[pos, col] = 1 if i % 2 == 0 else 0
+            w11[pos, col] = 2 + i % 8
+    return w10, doubled, w11
+
+
+@functools.lru_cache(maxsize=None)
+def _layout(length: int, width: int):
+    """Posições do código de barras, campos com DV próprio e matrizes de pesos para um tamanho de linha."""
+    if length == LINHA_BANCARIA_LENGTH:
+        barcode = list(range(0, 4)) + list(range(32, 47)) + list(range(4, 9)) + list(range(10, 20)) + list(range(21, 31))
+        fields = [(0, 9), (10, 20), (21, 31)]
+    elif length == LINHA_ARRECADACAO_LENGTH:
+        barcode = list(range(0, 11)) + list(range(12, 23)) + list(range(24, 35)) + list(range(36, 47))
+        fields = [(0, 11), (12, 23), (24, 35), (36, 47)]
+    else:
+        barcode = list(range(length))
+        fields = []
+
+    # Colunas: um DV por campo, depois o DV geral bancário (posição 5) e o de arrecadação (posição 4)
+    position_sets = [list(range(end - 1, start - 1, -1)) for start, end in fields]
+    position_sets.append([barcode[i] for i in range(BARCODE_LENGTH - 1, -1, -1) if i != 4])
+    position_sets.append([barcode[i] for i in range(BARCODE_LENGTH - 1, -1, -1) if i != 3])
+    expected_positions = [end for _, end in fields] + [barcode[4], barcode[3]]
+    return (barcode, fields, expected_positions) + _weight_matrices(width, position_sets)
+
+
+def _find_invalid_numpy(lines: List[str], lengths: Optional[Collection[int]]) -> Dict[int, str]:
+    reasons: Dict[int, str] = {}
+    if not lines:
+        return reasons
+
+    # Um único buffer com todas as linhas; início/fim de cada uma pelas quebras de linha
+    # (com '\n' também após a última linha, para que cada linha ocupe tamanho + 1 bytes)
+    blob = "\n".join(itertools.chain(lines, [""])).encode('utf-8')
+    # Caso comum: o arquivo inteiro só tem dígitos e a checagem linha a linha é dispensada
+    all_digits = not blob.translate(None, _DIGITS + b"\n")
+    buf = np.frombuffer(blob, dtype=np.uint8)
+    ends = np.flatnonzero(buf == ord('\n'))
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    line_lengths = ends - starts
+
+    counts = np.bincount(line_lengths)
+    dominant = int(counts.argmax())
+    for length in np.flatnonzero(counts):
+        problem = _length_problem(int(length), lengths, dominant)
+        if problem:
+            for i in np.flatnonzero(line_lengths == length).tolist():
+                reasons[i] = problem
+            continue
+        if counts[length] == len(lines):
+            # Todas as linhas têm o mesmo tamanho: o buffer já é a matriz (sem cópia);
+            # a coluna extra é o '\n', que recebe peso zero
+            indices = np.arange(len(lines))
+            matrix = buf.reshape(len(lines), length + 1)
+        else:
+            indices = np.flatnonzero(line_lengths == length)
+            matrix = buf[starts[indices, None] + np.arange(length)]
+        # Em blocos, para que as matrizes temporárias caibam no cache
+        for chunk in range(0, len(matrix), _CHUNK_ROWS):
+            for pos, reason in _check_group_numpy(matrix[chunk:chunk + _CHUNK_ROWS], int(length), all_digits):
+                reasons[int(indices[chunk + pos])] = reason
+    return reasons
+
+
+def _check_group_numpy(matrix, length: int, all_digits: bool):
+    """
+    Valida uma matriz com os bytes ASCII de linhas de um mesmo tamanho.
+    As colunas além de length (o '\n' do buffer original) são ignoradas.
+    """
+    rows = np.arange(len(matrix))
+    if not all_digits:
+        ok = ((matrix[:, :length] - ord('0')) <= 9).all(axis=1)  # uint8: bytes abaixo de '0' dão a volta e ficam > 9
+        for pos in np.flatnonzero(~ok):
+            yield int(pos), "conteúdo não numérico"
+        rows = np.flatnonzero(ok)
+        if len(rows) < len(matrix):
+            matrix = matrix[rows]
+
+    if length not in FEBRABAN_LENGTHS:
+        return
+
+    barcode, fields, expected_positions, w10, doubled, w11 = _layout(length, matrix.shape[1])
+    # Os bytes ASCII entram direto nos produtos; o '0' (48) de cada posição é descontado depois
+    values = matrix.astype(np.float32)
+    # Produtos maiores que 9 somam os dígitos (p - 9): acontece quando o dígito dobrado é >= 5
+    high = np.take(_HIGH_DIGIT, matrix)
+    sums10 = np.rint(values @ w10 - ord('0') * w10.sum(axis=0) - 9 * (high @ doubled)).astype(np.int32)
+    remainder11 = np.rint(values @ w11 - ord('0') * w11.sum(axis=0)).astype(np.int32) % 11
+    dv10 = (10 - sums10 % 10) % 10
+    # Bancário: restos 0 ou 1 (DV 11 ou 10) viram 1. Arrecadação: viram 0.
+    dv11_bancario = np.where(remainder11 <= 1, 1, 11 - remainder11)
+    dv11_arrecadacao = np.where(remainder11 <= 1, 0, 11 - remainder11)
+    expected = matrix[:, expected_positions].astype(np.int32) - ord('0')
+
+    arrecadacao = matrix[:, barcode[0]] == ord('8')
+    value_id = matrix[:, barcode[2]].astype(np.int32) - ord('0')
+    # Arrecadação: 3º dígito 6/7 usa módulo 10; 8/9 usa módulo 11
+    use_mod10 = ((value_id == 6) | (value_id == 7))[:, None]
+    known_mode = (value_id >= 6) & (value_id <= 9)
+    dv_arrecadacao = np.where(use_mod10, dv10, dv11_arrecadacao)
+
+    if length == LINHA_BANCARIA_LENGTH:
+        wrong_type = arrecadacao
+    elif length == LINHA_ARRECADACAO_LENGTH:
+        wrong_type = ~arrecadacao | ~known_mode
+    else:
+        wrong_type = arrecadacao & ~known_mode
+
+    n_fields = len(fields)
+    if length == LINHA_BANCARIA_LENGTH:
+        bad_fields = (dv10[:, :n_fields] != expected[:, :n_fields]).any(axis=1)
+    else:
+        bad_fields = (dv_arrecadacao[:, :n_fields] != expected[:, :n_fields]).any(axis=1)
+    bad_fields &= ~wrong_type
+
+    bad_general = np.where(
+        arrecadacao,
+        dv_arrecadacao[:, n_fields + 1] != expected[:, n_fields + 1],
+        dv11_bancario[:, n_fields] != expected[:, n_fields],
+    ) & ~wrong_type & ~bad_fields
+
+    for pos in np.flatnonzero(wrong_type):
+        yield int(rows[pos]), f"tipo de boleto incompatível com {length} dígitos"
+    for pos in np.flatnonzero(bad_fields):
+        yield int(rows[pos]), "DV de campo inválido"
+    for pos in np.flatnonzero(bad_general):
+        yield int(rows[pos]), "DV geral inválido"
+
+
+# --- Versão sem numpy (linha a linha) ---
+
+def _find_invalid_python(lines: List[str], lengths: Optional[Collection[int]]) -> Dict[int, str]:
+    encoded = [line.encode('utf-8') for line in lines]
+    groups: Dict[int, List[int]] = {}
+    for i, raw in enumerate(encoded):
+        groups.setdefault(len(raw), []).append(i)
+
+    reasons: Dict[int, str] = {}
+    # Empate: o menor comprimento, como o argmax do bincount na versão numpy
+    dominant = max(sorted(groups), key=lambda length: len(groups[length]), default=0)
+    for length, indices in groups.items():
+        problem = _length_problem(length, lengths, dominant)
+        if problem:
+            for i in indices:
+                reasons[i] = problem
+            continue
+        for pos, reason in _check_group_python([encoded[i] for i in indices], length):
+            reasons[indices[pos]] = reason
+    return reasons
+
+
+def _mod10(digits: List[int]) -> int:
+    total = 0
+    for i, d in enumerate(reversed(digits)):
+        p = d * (2 if i % 2 == 0 else 1)
+        total += p - 9 if p > 9 else p
+    return (10 - total % 10) % 10
+
+
+def _mod11(digits: List[int], bancario: bool) -> int:
+    total = sum(d * (2 + i % 8) for i, d in enumerate(reversed(digits)))
+    remainder = total % 11
+    if remainder <= 1:
+        return 1 if bancario else 0
+    return 11 - remainder
+
+
+def _arrecadacao_dv(digits: List[int], mode: int) -> int:
+    return _mod10(digits) if mode == 1 else _mod11(digits, bancario=False)
+
+
+def _check_group_python(group_bytes: List[bytes], length: int):
+    joined = b"".join(group_bytes)
+    all_digits = not joined.translate(None, _DIGITS)
+    if all_digits and length not in FEBRABAN_LENGTHS:
+        return
+    for pos, raw in enumerate(group_bytes):
+        if not all_digits and raw.translate(None, _DIGITS):
+            yield pos, "conteúdo não numérico"
+            continue
+        if length not in FEBRABAN_LENGTHS:
+            continue
+        reason = _check_febraban(list(raw[i] - 48 for i in range(length)))
+        if reason:
+            yield pos, reason
+
+
+def _check_febraban(digits: List[int]) -> Optional[str]:
+    length = len(digits)
+    if length == LINHA_BANCARIA_LENGTH:
+        barcode = digits[0:4] + digits[32:47] + digits[4:9] + digits[10:20] + digits[21:31]
+    elif length == LINHA_ARRECADACAO_LENGTH:
+        barcode = digits[0:11] + digits[12:23] + digits[24:35] + digits[36:47]
+    else:
+        barcode = digits
+
+    arrecadacao = barcode[0] == 8
+    mode = 1 if barcode[2] in (6, 7) else 2 if barcode[2] in (8, 9) else 0
+    if (length == LINHA_BANCARIA_LENGTH and arrecadacao) or (arrecadacao and mode == 0) \
+            or (length == LINHA_ARRECADACAO_LENGTH and not arrecadacao):
+        return f"tipo de boleto incompatível com {length} dígitos"
+
+    if length == LINHA_BANCARIA_LENGTH:
+        for start, end in ((0, 9), (10, 20), (21, 31)):
+            if _mod10(digits[start:end]) != digits[end]:
+                return "DV de campo inválido"
+    elif length == LINHA_ARRECADACAO_LENGTH:
+        for start in (0, 12, 24, 36):
+            if _arrecadacao_dv(digits[start:start + 11], mode) != digits[start + 11]:
+                return "DV de campo inválido"
+
+    if arrecadacao:
+        if _arrecadacao_dv(barcode[:3] + barcode[4:], mode) != barcode[3]:
+            return "DV geral inválido"
+    elif _mod11(barcode[:4] + barcode[5:], bancario=True) != barcode[4]:
+        return "DV geral inválido"
+    return None
@@ -0,0 +1,11 @@
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Os testes não enviam eventos reais de mouse/teclado; sem display o pyautogui nem importa.
+try:
+    import pyautogui  # noqa: F401
+except Exception:
+    sys.modules["pyautogui"] = types.ModuleType("pyautogui")
@@ -0,0 +1,176 @@
+import os
+
+from src.automation import AutomationEngine
+
+
+def _write(path, content: bytes, mtime_ns: int):
+    with open(path, 'wb') as f:
+        f.write(content)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _poll(engine):
+    engine._check_data_file()
+    engine.apply_pending_reload()
+
+
+def test_reload_appended_lines(tmp_path):
+    path = str(tmp_path / "dados.txt")
+    _write(path, b"1001\n1002\n10", 1_000_000_000)
+    engine = AutomationEngine()
+    engine.load_data_file(path)
+
+    with open(path, 'ab') as f:
+        f.write(b"03\n1004\n")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    _poll(engine)
+    assert engine.data_lines == ["1001", "1002", "1003", "1004"]
+
+
+def test_reload_same_size_edit_rereads_file(tmp_path):
+    path = str(tmp_path / "dados.txt")
+    codes = [str(1000 + i) for i in range(200)]
+    _write(path, "\n".join(codes).encode() + b"\n", 1_000_000_000)
+    engine = AutomationEngine()
+    engine.load_data_file(path)
+
+    codes[3] = "9999"
+    _write(path, "\n".join(codes).encode() + b"\n", 2_000_000_000)
+    _poll(engine)
+    assert engine.data_lines[3] == "9999"
+
+
+def test_reload_early_edit_with_append_rereads_file(tmp_path):
+    path = str(tmp_path / "dados.txt")
+    _write(path, b"1001\n1002\n1003\n", 1_000_000_000)
+    engine = AutomationEngine()
+    engine.load_data_file(path)
+
+    _write(path, b"9999\n1002\n1003\n1004\n", 2_000_000_000)
+    _poll(engine)
+    assert engine.data_lines == ["9999", "1002", "1003", "1004"]
+
+
+def test_reload_discarded_when_other_file_loaded(tmp_path):
+    old_path, new_path = str(tmp_path / "antigo.txt"), str(tmp_path / "novo.txt")
+    _write(old_path, b"1\n", 1_000_000_000)
+    _write(new_path, b"2\n", 1_000_000_000)
+    engine = AutomationEngine()
+    engine.load_data_file(old_path)
+    _write(old_path, b"3\n", 2_000_000_000)
+
+    # Simula o usuário carregando outro arquivo enquanto a vigilância lê o antigo
+    original = engine._data_state_from_bytes
+    def load_other_during_read(raw, stat):
+        engine._data_state_from_bytes = original
+        engine.load_data_file(new_path)
+        return original(raw, stat)
+    engine._data_state_from_bytes = load_other_during_read
+    _poll(engine)
+    assert engine.data_lines == ["2"]
+
+
+def test_data_lines_split_only_on_newline(tmp_path):
+    path = str(tmp_path / "dados.txt")
+    _write(path, b"12\x0c34\r\n56\n", 1_000_000_000)
+    engine = AutomationEngine()
+    assert engine.load_data_file(path) == 2
+    assert engine.data_lines == ["12\x0c34", "56"]
+
+
+def test_run_stops_when_reloaded_data_has_no_valid_rows(tmp_path, monkeypatch):
+    from types import SimpleNamespace
+    from src import automation
+
+    typed = []
+    monkeypatch.setattr(automation, "pyautogui", SimpleNamespace(
+        position=lambda: (0, 0), moveTo=lambda *a: None, click=lambda **k: None,
+        hotkey=lambda *a: None, press=lambda *a: None, write=lambda text, **k: typed.append(text),
+    ))
+    monkeypatch.setattr(automation, "time", SimpleNamespace(sleep=lambda s: None))
+
+    path = str(tmp_path / "dados.txt")
+    _write(path, b"8124\n", 1_000_000_000)
+    engine = AutomationEngine()
+    engine.load_data_file(path)
+    engine.add_step(10, 10, 0.0, action_type='type', use_data_file=True)
+    _write(path, b"abc\nxyz\n", 2_000_000_000)
+    engine._check_data_file()
+
+    errors = []
+    engine.execute_sequence(loops=3, on_reload_callback=errors.append, validate_data=True)
+    assert typed == []
+    assert errors and errors[0]
+    assert os.path.exists(str(tmp_path / "dados_invalidos.txt"))
+
+
+def test_reload_append_reads_only_new_bytes(tmp_path, monkeypatch):
+    from src import automation
+    monkeypatch.setattr(automation, "APPEND_CHECK_WINDOW", 16)
+    path = str(tmp_path / "dados.txt")
+    _write(path, b"".join(b"%04d\n" % i for i in range(1000)), 1_000_000_000)
+    engine = AutomationEngine()
+    engine.load_data_file(path)
+
+    # Uma edição antes da janela final não é relida no acréscimo (compromisso documentado)
+    with open(path, 'r+b') as f:
+        f.write(b"9999")
+        f.seek(0, os.SEEK_END)
+        f.write(b"1000\n")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    _poll(engine)
+    assert engine.data_lines[0] == "0000"
+    assert engine.data_lines[-1] == "1000"
+
+    # Mudança dentro da janela final faz reler tudo
+    with open(path, 'r+b') as f:
+        f.seek(-5, os.SEEK_END)
+        f.write(b"7777\n8888\n")
+    os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+    _poll(engine)
+    assert engine.data_lines[0] == "9999"
+    assert engine.data_lines[-2:] == ["7777", "8888"]
+
+
+def test_invalid_sequence_reload_logged_once(tmp_path, caplog):
+    path = str(tmp_path / "seq.json")
+    engine = AutomationEngine()
+    engine.add_step(1, 1, 0.0)
+    engine.save_to_file(path)
+    _write(path, b'[{"x": 1', 2_000_000_000)
+
+    for _ in range(3):
+        assert not engine._check_sequence_file()
+    assert len([r for r in caplog.records if "Erro ao recarregar" in r.getMessage()]) == 1
+
+    _write(path, b'[{"x": 5, "y": 6, "delay": 0, "button": "left"}]', 3_000_000_000)
+    assert engine._check_sequence_file()
+    engine.apply_pending_reload()
+    assert (engine.steps[0].x, engine.steps[0].y) == (5, 6)
+    assert not engine.has_unsaved_changes()
+
+
+def test_sequence_reload_detects_same_mtime_size_change(tmp_path):
+    path = str(tmp_path / "seq.json")
+    engine = AutomationEngine()
+    engine.add_step(1, 1, 0.0)
+    engine.save_to_file(path)
+    with open(path, 'a') as f:
+        f.write("\n")
+    os.utime(path, ns=(engine._sequence_stat[0], engine._sequence_stat[0]))
+    assert engine._check_sequence_file()
+
+
+def test_validation_reports_file_line_numbers(tmp_path):
+    path = str(tmp_path / "dados.txt")
+    _write(path, b"1234\n\n12x4\n\n5678\n", 1_000_000_000)
+    engine = AutomationEngine()
+    engine.load_data_file(path)
+    with open(path, 'ab') as f:
+        f.write(b"\n99999\n")
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    _poll(engine)
+
+    report = engine.validate_data()
+    assert [(n, content) for n, content, _ in report.invalid] == [(3, "12x4"), (7, "99999")]
+    assert engine.data_line_numbers == [1, 5]
@@ -0,0 +1,79 @@
+from src.automation import ClickStep
+from src.optimizer import estimate_duration, optimize_steps
+
+
+def test_same_point_steps_skip_settle_and_report_saving():
+    steps = [ClickStep(10, 10, 0.5), ClickStep(10, 10, 0.5, 'right'), ClickStep(20, 20, 0.5)]
+    result = optimize_steps(steps)
+    assert [s.skip_settle for s in result.steps] == [False, True, False]
+    assert any("Passo 2" in change for change in result.changes)
+    assert result.time_saved > 0
+    assert not any(s.skip_settle for s in steps)  # Original intacta
+
+
+def test_adjacent_typing_into_same_field_is_merged():
+    steps = [ClickStep(5, 5, 0.0, 'left', 'type', "ab", clear_field=True), ClickStep(5, 5, 1.0, 'left', 'type', "cd")]
+    result = optimize_steps(steps)
+    assert len(result.steps) == 1
+    assert result.steps[0].text_content == "abcd"
+    assert result.steps[0].clear_field and result.steps[0].delay == 1.0
+    assert result.time_after == estimate_duration(result.steps) < result.time_before
+
+
+def test_removing_step_clears_stale_skip_settle():
+    from src.automation import AutomationEngine
+    engine = AutomationEngine()
+    engine.set_steps(optimize_steps([ClickStep(1, 1, 0.5), ClickStep(2, 2, 0.5), ClickStep(2, 2, 0.5)]).steps)
+    assert engine.steps[2].skip_settle
+    engine.remove_step(1)
+    assert not engine.steps[1].skip_settle
+
+
+def _write_sequence(path, mtime_ns):
+    import json, os
+    with open(path, 'w') as f:
+        json.dump([
+            {"x": 1, "y": 1, "delay": 0, "button": "left"},
+            {"x": 500, "y": 500, "delay": 0, "button": "left", "skip_settle": True},
+        ], f)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_loaded_sequence_clears_stale_skip_settle(tmp_path):
+    from src.automation import AutomationEngine
+    path = str(tmp_path / "seq.json")
+    _write_sequence(path, 1_000_000_000)
+    engine = AutomationEngine()
+    engine.load_from_file(path)
+    assert not engine.steps[1].skip_settle
+    assert not engine.has_unsaved_changes()
+
+
+def test_reloaded_sequence_clears_stale_skip_settle(tmp_path):
+    from src.automation import AutomationEngine
+    path = str(tmp_path / "seq.json")
+    engine = AutomationEngine()
+    engine.add_step(1, 1, 0.0)
+    engine.save_to_file(path)
+    _write_sequence(path, 2_000_000_000)
+    assert engine._check_sequence_file()
+    engine.apply_pending_reload()
+    assert (engine.steps[1].x, engine.steps[1].y) == (500, 500)
+    assert not engine.steps[1].skip_settle
+
+
+def test_skip_settle_still_moves_the_mouse(monkeypatch):
+    from types import SimpleNamespace
+    from src import automation
+    from src.automation import AutomationEngine, SETTLE_DELAY
+
+    moves, sleeps = [], []
+    monkeypatch.setattr(automation, "pyautogui", SimpleNamespace(
+        moveTo=lambda x, y: moves.append((x, y)), click=lambda **k: None, rightClick=lambda **k: None,
+    ))
+    monkeypatch.setattr(automation, "time", SimpleNamespace(sleep=sleeps.append))
+    engine = AutomationEngine()
+    engine.set_steps(optimize_steps([ClickStep(3, 4, 0.0), ClickStep(3, 4, 0.0, 'right')]).steps)
+    engine.execute_sequence()
+    assert moves == [(3, 4), (3, 4)]
+    assert sleeps.count(SETTLE_DELAY) == 1
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from src import validation
+from src.validation import validate_lines, write_quarantine
+
+BOLETO_47 = "00190500954014481606906809350314337370000000100"
+BARCODE_44 = "00193373700000001000500940144816060680935031"
+ARRECADACAO_48_MOD10 = "816900000018234567890129345000000009000000000018"
+ARRECADACAO_48_MOD11 = "818600000056678901234561789012345675890000111127"
+VALID = [BOLETO_47, BARCODE_44, ARRECADACAO_48_MOD10, ARRECADACAO_48_MOD11]
+
+
+@pytest.fixture(params=["numpy", "python"])
+def implementation(request, monkeypatch):
+    """Roda o teste com a versão vetorizada e com a versão linha a linha."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(validation, "np", None)
+    return request.param
+
+
+def _mutate(line: str, pos: int) -> str:
+    return line[:pos] + str((int(line[pos]) + 1) % 10) + line[pos + 1:]
+
+
+def test_known_valid_lines(implementation):
+    report = validate_lines(VALID)
+    assert report.invalid == []
+    assert report.valid_lines == VALID
+
+
+def test_field_digit_mutants_rejected(implementation):
+    # Todo dígito dos campos da linha bancária e toda posição da arrecadação mód. 10
+    # estão cobertos por um DV mód. 10, que detecta qualquer troca de um dígito
+    mutants = [_mutate(BOLETO_47, pos) for pos in range(32)]
+    mutants += [_mutate(ARRECADACAO_48_MOD10, pos) for pos in range(48)]
+    report = validate_lines(mutants, lengths=[47, 48])
+    assert report.valid_lines == []
+
+
+def test_general_dv_mutants_rejected(implementation):
+    mutants = [_mutate(BOLETO_47, 32), _mutate(BARCODE_44, 4), _mutate(ARRECADACAO_48_MOD11, 3)]
+    reasons = [reason for _, _, reason in validate_lines(mutants).invalid]
+    assert reasons == ["DV geral inválido", "DV geral inválido", "DV de campo inválido"]
+
+
+def test_non_numeric_and_wrong_length(implementation):
+    lines = [BOLETO_47, BOLETO_47[:-1] + "x", BOLETO_47[:46], BOLETO_47 + "00", "8" + BOLETO_47[1:]]
+    report = validate_lines(lines, line_numbers=[3, 5, 6, 9, 10])
+    assert report.valid_lines == [BOLETO_47]
+    assert report.valid_line_numbers == [3]
+    assert [(n, reason) for n, _, reason in report.invalid] == [
+        (5, "conteúdo não numérico"),
+        (6, "comprimento 46 diferente do predominante no arquivo (47)"),
+        (9, "comprimento 49 diferente do predominante no arquivo (47)"),
+        (10, "tipo de boleto incompatível com 47 dígitos"),
+    ]
+
+
+def test_explicit_lengths(implementation):
+    report = validate_lines(["1234", "123456", BOLETO_47], lengths=[6, 47])
+    assert report.valid_lines == ["123456", BOLETO_47]
+    assert report.invalid[0][2] == "comprimento 4 fora dos permitidos (6, 47)"
+
+
+def test_numpy_and_python_agree():
+    pytest.importorskip("numpy")
+    rng = random.Random(28)
+    lines = []
+    for _ in range(3000):
+        line = list(rng.choice(VALID))
+        for _ in range(rng.choice([0, 0, 1, 2])):
+            line[rng.randrange(len(line))] = rng.choice("0123456789x ")
+        if rng.random() < 0.05:
+            line = line[:rng.randrange(1, len(line))]
+        lines.append("".join(line))
+    lines.append("8" + BARCODE_44[1:])  # Arrecadação com 3º dígito fora de 6-9
+
+    for lengths in (None, [44, 47, 48]):
+        assert validation._find_invalid_numpy(lines, lengths) == validation._find_invalid_python(lines, lengths)
+
+
+def test_quarantine_reports_file_line_numbers(tmp_path, caplog):
+    report = validate_lines(["1234", "12x4"], line_numbers=[2, 7])
+    path = str(tmp_path / "invalidos.txt")
+    write_quarantine(report, path)
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "12x4\n"
+    assert "Linha 7 em quarentena" in caplog.text